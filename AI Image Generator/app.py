@@ -1,12 +1,23 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template_string
+from flask import Flask, request, jsonify, send_file, send_from_directory, render_template_string
 from flask_cors import CORS
-import requests
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+import aiohttp
+import orjson
+import asyncio
+import atexit
+import threading
+import tempfile
 import os
 import time
 import base64
-import urllib.parse
+import io
+from urllib.parse import quote_from_bytes
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
 from dotenv import load_dotenv
-from functools import wraps
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +27,9 @@ app = Flask(__name__)
 # Configure CORS
 CORS(app)
 
+# Gzip JSON responses for clients that send Accept-Encoding
+Compress(app)
+
 # Get API key from environment
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
@@ -24,32 +38,220 @@ if not GOOGLE_API_KEY:
 else:
     print("✓ API Key loaded successfully")
 
-# Rate limiting tracking
-request_timestamps = []
-MAX_REQUESTS_PER_MINUTE = 10  # Conservative limit
+GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GOOGLE_API_KEY}"
+GEMINI_HEADERS = {"Content-Type": "application/json"}
 
-def rate_limit(f):
-    """Decorator to rate limit API calls"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        global request_timestamps
-        now = time.time()
-        
-        # Remove timestamps older than 1 minute
-        request_timestamps = [ts for ts in request_timestamps if now - ts < 60]
-        
-        # Check if we've exceeded the limit
-        if len(request_timestamps) >= MAX_REQUESTS_PER_MINUTE:
-            return jsonify({
-                "success": False,
-                "error": "Rate limit reached. Please wait a moment before trying again."
-            }), 429
-        
-        # Add current timestamp
-        request_timestamps.append(now)
-        
-        return f(*args, **kwargs)
-    return decorated_function
+# ============================================
+# ASYNC HTTP CLIENT
+# ============================================
+
+# Upstream calls run on one background event loop so a single pooled
+# aiohttp session is shared by every request thread
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="aiohttp-loop", daemon=True).start()
+
+
+def run_async(coro):
+    """Run a coroutine on the background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def _create_session():
+    # Per-host cap covers every gthread request thread (--threads 16) so calls
+    # never queue for a connection inside their ClientTimeout budget
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
+    return aiohttp.ClientSession(connector=connector)
+
+
+HTTP = run_async(_create_session())
+
+
+@atexit.register
+def _close_session():
+    run_async(HTTP.close())
+    _loop.call_soon_threadsafe(_loop.stop)
+
+
+# Retry policy shared by all upstream calls
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 2
+
+
+async def send_request(method, url, retries=MAX_RETRIES, **kwargs):
+    """Send a request on the shared session, retrying transient failures with backoff"""
+    for attempt in range(retries + 1):
+        try:
+            response = await HTTP.request(method, url, **kwargs)
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            if attempt == retries:
+                raise
+            reason = "connection error"
+        else:
+            if response.status not in RETRY_STATUSES or attempt == retries:
+                return response
+            response.release()
+            reason = f"HTTP {response.status}"
+
+        wait_time = BACKOFF_FACTOR * (2 ** attempt)
+        print(f"⏳ {reason}, retrying in {wait_time} seconds (attempt {attempt + 2}/{retries + 1})...")
+        await asyncio.sleep(wait_time)
+
+
+# Rate limiting, shared by the upstream-calling endpoints. Set
+# RATELIMIT_STORAGE_URI (e.g. redis://localhost:6379) to share counters
+# across worker processes.
+RATE_LIMIT = "10 per minute"  # Conservative limit
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    storage_uri=os.getenv('RATELIMIT_STORAGE_URI', 'memory://'),
+    strategy="fixed-window"
+)
+
+
+# ============================================
+# PROMPT CACHE
+# ============================================
+
+# Enhanced prompts keyed by a hash of the normalized query
+ENHANCE_CACHE_SIZE = 2048
+ENHANCE_CACHE_TTL = 3600  # seconds
+_enhance_cache = OrderedDict()
+_enhance_cache_lock = threading.Lock()
+
+ENHANCE_SYSTEM_INSTRUCTION = (
+    "You are an expert AI art prompt engineer. Rewrite the following user description "
+    "into a detailed, high-quality image generation prompt. Include details about lighting, "
+    "camera angle, texture, and mood. Keep it under 60 words. Output ONLY the raw prompt, "
+    "no intro/outro text."
+)
+
+
+def enhance_cache_key(user_prompt):
+    """Hash the system instruction and prompt, ignoring case and whitespace"""
+    normalized = " ".join(user_prompt.split()).lower()
+    return hashlib.sha256(f"{ENHANCE_SYSTEM_INSTRUCTION}\n\n{normalized}".encode('utf-8')).hexdigest()
+
+
+def get_cached_enhancement(key):
+    """Return a cached enhanced prompt, or None if missing or expired"""
+    with _enhance_cache_lock:
+        entry = _enhance_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del _enhance_cache[key]
+            return None
+        _enhance_cache.move_to_end(key)
+        return text
+
+
+def cache_enhancement(key, text):
+    """Store an enhanced prompt, evicting the least recently used entry when full"""
+    with _enhance_cache_lock:
+        _enhance_cache[key] = (time.monotonic() + ENHANCE_CACHE_TTL, text)
+        _enhance_cache.move_to_end(key)
+        while len(_enhance_cache) > ENHANCE_CACHE_SIZE:
+            _enhance_cache.popitem(last=False)
+
+
+def enhancement_is_cached():
+    """Rate limit exemption: repeat prompts are served without calling Gemini"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('prompt'), str):
+        return False
+    return get_cached_enhancement(enhance_cache_key(data['prompt'])) is not None
+
+
+# ============================================
+# IMAGE CACHE
+# ============================================
+
+# Preview images are generated at a quarter of the pixels; full size on request
+PREVIEW_SIZE = 512
+HIRES_SIZE = 1024
+
+# Generated image bytes stored on disk, keyed by sha256 of the final prompt and size.
+# The file extension records the upstream Content-Type.
+IMAGE_CACHE_DIR = Path(app.root_path) / "image_cache"
+IMAGE_TYPES = {".jpg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+DEFAULT_IMAGE_EXT = ".jpg"
+IMAGE_CACHE_MAX_BYTES = 2 << 30  # 2 GB
+IMAGE_CACHE_EVICT_GRACE = 60  # seconds; recently used files are never evicted
+IMAGE_CACHE_DIR.mkdir(exist_ok=True)
+
+
+def image_cache_key(final_prompt, size):
+    return hashlib.sha256(f"{size}x{size}:{final_prompt}".encode('utf-8')).hexdigest()
+
+
+def image_seed(final_prompt):
+    """Deterministic Pollinations seed so preview and hires renders of a prompt match"""
+    digest = hashlib.sha256(final_prompt.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') & 0x7FFFFFFF
+
+
+def image_extension(content_type):
+    """Cache file extension for an upstream Content-Type header"""
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    for ext, known in IMAGE_TYPES.items():
+        if known == mimetype:
+            return ext
+    return DEFAULT_IMAGE_EXT
+
+
+def get_cached_image(final_prompt, size):
+    """Return (opened image, mimetype) from the cache, or None on a miss"""
+    key = image_cache_key(final_prompt, size)
+    for ext, mimetype in IMAGE_TYPES.items():
+        path = IMAGE_CACHE_DIR / f"{key}{ext}"
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+            return open(path, 'rb'), mimetype
+        except FileNotFoundError:
+            # Missing, or evicted by another worker between the two calls
+            continue
+    return None
+
+
+def cache_image(final_prompt, size, image_buffer, content_type):
+    """Persist an image atomically, evict old files over the size limit, and return it opened"""
+    ext = image_extension(content_type)
+    path = IMAGE_CACHE_DIR / f"{image_cache_key(final_prompt, size)}{ext}"
+    # Unique across threads and worker processes
+    tmp = tempfile.NamedTemporaryFile(dir=IMAGE_CACHE_DIR, suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            tmp.write(image_buffer.getbuffer())
+        os.replace(tmp.name, path)
+    except BaseException:
+        # Eviction only tracks image files, so don't leave the temp file behind
+        os.unlink(tmp.name)
+        raise
+    image_file = open(path, 'rb')
+    
+    entries = []
+    for p in IMAGE_CACHE_DIR.iterdir():
+        if p.suffix not in IMAGE_TYPES:
+            continue
+        try:
+            entries.append((p.stat(), p))
+        except FileNotFoundError:
+            continue
+    total = sum(st.st_size for st, _ in entries)
+    cutoff = time.time() - IMAGE_CACHE_EVICT_GRACE
+    for st, p in sorted(entries, key=lambda e: e[0].st_mtime):
+        if total <= IMAGE_CACHE_MAX_BYTES or st.st_mtime >= cutoff:
+            break
+        try:
+            p.unlink(missing_ok=True)
+        except OSError:
+            continue  # Still open elsewhere on platforms that lock open files
+        total -= st.st_size
+    
+    return image_file, IMAGE_TYPES[ext]
 
 
 # ============================================
@@ -112,96 +314,171 @@ def index():
 # HELPER FUNCTIONS
 # ============================================
 
-def call_gemini_text(prompt, retries=3):
-    """Call Gemini API for text generation with retry logic"""
-    for attempt in range(retries):
-        try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GOOGLE_API_KEY}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
+async def call_gemini_text(prompt):
+    """Call Gemini API for text generation"""
+    try:
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
                 }]
-            }
-            
-            response = requests.post(url, json=payload, timeout=30)
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                if attempt < retries - 1:
-                    wait_time = (attempt + 1) * 2  # Exponential backoff
-                    print(f"Rate limited. Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    raise Exception("Rate limit exceeded. Please wait a minute and try again.")
+            }]
+        }
+        
+        response = await send_request("POST", GEMINI_URL, json=payload, headers=GEMINI_HEADERS, timeout=aiohttp.ClientTimeout(total=30))
+        async with response:
+            # Still rate limited after all retries
+            if response.status == 429:
+                raise Exception("Rate limit exceeded. Please wait a minute and try again.")
             
             response.raise_for_status()
-            data = response.json()
-            
-            if 'error' in data:
-                raise Exception(data['error'].get('message', 'Unknown error'))
-            
-            if not data.get('candidates') or not data['candidates'][0].get('content'):
-                raise Exception("No response from Gemini")
-            
-            return data['candidates'][0]['content']['parts'][0]['text']
-            
-        except requests.exceptions.Timeout:
-            if attempt < retries - 1:
-                time.sleep(2)
-                continue
-            raise Exception("Request timed out after multiple attempts")
-        except requests.exceptions.RequestException as e:
-            if attempt < retries - 1:
-                time.sleep(2)
-                continue
-            raise Exception(f"API request failed: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Gemini API error: {str(e)}")
-
-
-def call_imagen(prompt, retries=2):
+            data = await response.json()
+        
+        if 'error' in data:
+            raise Exception(data['error'].get('message', 'Unknown error'))
+        
+        if not data.get('candidates') or not data['candidates'][0].get('content'):
+            raise Exception("No response from Gemini")
+        
+        return data['candidates'][0]['content']['parts'][0]['text']
+        
+    except asyncio.TimeoutError:
+        raise Exception("Request timed out after multiple attempts")
+    except aiohttp.ClientError as e:
+        raise Exception(f"API request failed: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Gemini API error: {str(e)}")
+
+
+async def call_imagen(prompt, width=PREVIEW_SIZE, height=PREVIEW_SIZE):
     """Generate image using Pollinations.AI (free, no API key needed)"""
-    
-    for attempt in range(retries):
-        try:
-            # URL encode the prompt
-            encoded_prompt = urllib.parse.quote(prompt)
-            
-            # Pollinations.AI endpoint - 100% FREE, no API key needed!
-            url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1024&height=1024&nologo=true&enhance=true"
-            
-            print(f"🎨 Calling Pollinations.AI (Free Image Generation)...")
-            print(f"📝 Prompt: {prompt[:80]}...")
-            
-            response = requests.get(url, timeout=60)
+    try:
+        # Encode the prompt as a single path segment
+        encoded_prompt = quote_from_bytes(prompt.encode('utf-8'), safe='')
+        
+        # Pollinations.AI endpoint - 100% FREE, no API key needed!
+        url = f"https://image.pollinations.ai/prompt/{encoded_prompt}"
+        # Fixed seed and no upstream prompt rewriting keep renders reproducible
+        params = {"width": width, "height": height, "seed": image_seed(prompt), "nologo": "true"}
+        
+        print(f"🎨 Calling Pollinations.AI (Free Image Generation)...")
+        print(f"📝 Prompt: {prompt[:80]}...")
+        
+        # Stream the body into one buffer instead of building intermediate copies
+        image_buffer = io.BytesIO()
+        # One retry keeps the worst case (2 x 60s + backoff) near gunicorn's 120s timeout
+        response = await send_request("GET", url, retries=1, params=params, timeout=aiohttp.ClientTimeout(total=60))
+        async with response:
             response.raise_for_status()
-            
-            # Get image bytes and convert to base64
-            image_bytes = response.content
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            
-            print(f"✅ Image generated successfully ({len(image_bytes)} bytes)")
-            
-            return base64_image
-            
-        except requests.exceptions.Timeout:
-            if attempt < retries - 1:
-                print(f"⏳ Timeout, retrying (attempt {attempt + 2}/{retries})...")
-                time.sleep(3)
-                continue
-            raise Exception("Image generation timed out. Please try again.")
-        except requests.exceptions.RequestException as e:
-            if attempt < retries - 1:
-                print(f"❌ Request failed, retrying (attempt {attempt + 2}/{retries})...")
-                time.sleep(3)
-                continue
-            raise Exception(f"Image generation failed: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Image generation error: {str(e)}")
+            content_type = response.headers.get("Content-Type")
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                image_buffer.write(chunk)
+        
+        print(f"✅ Image generated successfully ({image_buffer.tell()} bytes)")
+        
+        return image_buffer, content_type
+        
+    except asyncio.TimeoutError:
+        raise Exception("Image generation timed out. Please try again.")
+    except aiohttp.ClientError as e:
+        raise Exception(f"Image generation failed: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Image generation error: {str(e)}")
+
+
+def enhance_text(user_prompt):
+    """Enhance a prompt with Gemini, serving repeats from the prompt cache"""
+    cache_key = enhance_cache_key(user_prompt)
+    enhanced_text = get_cached_enhancement(cache_key)
+    
+    if enhanced_text is None:
+        full_query = f"{ENHANCE_SYSTEM_INSTRUCTION}\n\nUser Input: {user_prompt}"
+        enhanced_text = run_async(call_gemini_text(full_query)).strip()
+        cache_enhancement(cache_key, enhanced_text)
+    
+    return enhanced_text
+
+
+def generate_image_file(final_prompt, size):
+    """Generate an image with Pollinations.AI, serving repeats from the image cache.
+    
+    Returns (open binary file, mimetype); callers are responsible for closing the file.
+    """
+    cached = get_cached_image(final_prompt, size)
+    
+    if cached is None:
+        print(f"🎨 Generating image with prompt: {final_prompt[:100]}...")
+        
+        # Generate image using Pollinations.AI
+        image_buffer, content_type = run_async(call_imagen(final_prompt, width=size, height=size))
+        cached = cache_image(final_prompt, size, image_buffer, content_type)
+        
+        print("✅ Image generation complete")
+    else:
+        print(f"⚡ Serving cached image for prompt: {final_prompt[:100]}...")
+    
+    return cached
+
+
+def generate_base64_image(final_prompt, size):
+    """Generate an image and return (base64 data, mimetype) for JSON responses"""
+    image_file, mimetype = generate_image_file(final_prompt, size)
+    with image_file:
+        return base64.b64encode(image_file.read()).decode('utf-8'), mimetype
+
+
+def requested_image_size():
+    """Preview size unless the request body sets "preview": false"""
+    data = request.get_json(silent=True) or {}
+    return PREVIEW_SIZE if data.get('preview', True) else HIRES_SIZE
+
+
+def image_response(payload):
+    """JSON response for multi-MB image payloads, serialized with orjson"""
+    return app.response_class(orjson.dumps(payload), status=200, mimetype='application/json')
+
+
+def parse_prompt_request():
+    """Validate a prompt/style request body, returning (prompt, style, error_response)"""
+    data = request.get_json()
+    
+    if not data or 'prompt' not in data:
+        return None, None, (jsonify({
+            "success": False,
+            "error": "No prompt provided"
+        }), 400)
+    
+    prompt = data['prompt'].strip()
+    style = data.get('style', '').strip()
+    
+    if not prompt:
+        return None, None, (jsonify({
+            "success": False,
+            "error": "Prompt cannot be empty"
+        }), 400)
+    
+    if len(prompt) > 1000:
+        return None, None, (jsonify({
+            "success": False,
+            "error": "Prompt too long (max 1000 characters)"
+        }), 400)
+    
+    return prompt, style, None
+
+
+def styled_prompt(prompt, style):
+    """Build final prompt with optional style"""
+    if style:
+        return f"{prompt}, {style} style"
+    return prompt
+
+
+def parse_image_request():
+    """Validate an image request body, returning (final_prompt, error_response)"""
+    prompt, style, error_response = parse_prompt_request()
+    if error_response:
+        return None, error_response
+    return styled_prompt(prompt, style), None
 
 
 # ============================================
@@ -221,7 +498,7 @@ def health_check():
 
 
 @app.route('/api/enhance-prompt', methods=['POST'])
-@rate_limit
+@limiter.shared_limit(RATE_LIMIT, scope="upstream", exempt_when=enhancement_is_cached)
 def enhance_prompt():
     """Enhance user prompt using Gemini"""
     try:
@@ -247,21 +524,11 @@ def enhance_prompt():
                 "error": "Prompt too long (max 1000 characters)"
             }), 400
         
-        # System instruction for prompt enhancement
-        system_instruction = (
-            "You are an expert AI art prompt engineer. Rewrite the following user description "
-            "into a detailed, high-quality image generation prompt. Include details about lighting, "
-            "camera angle, texture, and mood. Keep it under 60 words. Output ONLY the raw prompt, "
-            "no intro/outro text."
-        )
-        
-        full_query = f"{system_instruction}\n\nUser Input: {user_prompt}"
-        
-        enhanced_text = call_gemini_text(full_query)
+        enhanced_text = enhance_text(user_prompt)
         
         return jsonify({
             "success": True,
-            "enhanced_prompt": enhanced_text.strip()
+            "enhanced_prompt": enhanced_text
         }), 200
         
     except Exception as e:
@@ -272,50 +539,91 @@ def enhance_prompt():
 
 
 @app.route('/api/generate-image', methods=['POST'])
-@rate_limit
+@limiter.shared_limit(RATE_LIMIT, scope="upstream")
 def generate_image():
-    """Generate image using Pollinations.AI"""
+    """Generate image using Pollinations.AI (preview size by default)"""
+    return generate_image_json(requested_image_size())
+
+
+@app.route('/api/generate-image/hires', methods=['POST'])
+@limiter.shared_limit(RATE_LIMIT, scope="upstream")
+def generate_image_hires():
+    """Generate the full resolution image for a confirmed prompt"""
+    return generate_image_json(HIRES_SIZE)
+
+
+def generate_image_json(size):
+    """Generate an image at the given size and return it as base64 JSON"""
     try:
-        data = request.get_json()
-        
-        if not data or 'prompt' not in data:
-            return jsonify({
-                "success": False,
-                "error": "No prompt provided"
-            }), 400
+        final_prompt, error_response = parse_image_request()
+        if error_response:
+            return error_response
         
-        prompt = data['prompt'].strip()
-        style = data.get('style', '').strip()
+        base64_image, mimetype = generate_base64_image(final_prompt, size)
         
-        if not prompt:
-            return jsonify({
-                "success": False,
-                "error": "Prompt cannot be empty"
-            }), 400
+        return image_response({
+            "success": True,
+            "image": base64_image,
+            "mimetype": mimetype,
+            "prompt_used": final_prompt,
+            "width": size,
+            "height": size
+        })
         
-        if len(prompt) > 1000:
-            return jsonify({
-                "success": False,
-                "error": "Prompt too long (max 1000 characters)"
-            }), 400
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/generate-image/raw', methods=['POST'])
+@limiter.shared_limit(RATE_LIMIT, scope="upstream")
+def generate_image_raw():
+    """Generate image using Pollinations.AI and return the image bytes directly"""
+    try:
+        final_prompt, error_response = parse_image_request()
+        if error_response:
+            return error_response
         
-        # Build final prompt with optional style
-        final_prompt = prompt
-        if style:
-            final_prompt += f", {style} style"
+        image_file, mimetype = generate_image_file(final_prompt, requested_image_size())
+        return send_file(image_file, mimetype=mimetype)
         
-        print(f"🎨 Generating image with prompt: {final_prompt[:100]}...")
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/enhance-and-generate', methods=['POST'])
+@limiter.shared_limit(RATE_LIMIT, scope="upstream")
+def enhance_and_generate():
+    """Enhance a prompt with Gemini and generate its image in one round trip"""
+    try:
+        user_prompt, style, error_response = parse_prompt_request()
+        if error_response:
+            return error_response
         
-        # Generate image using Pollinations.AI
-        base64_image = call_imagen(final_prompt)
+        # Image generation depends on the enhanced text, so the two
+        # upstream calls run back to back within this single request
+        enhanced_text = enhance_text(user_prompt)
+        final_prompt = styled_prompt(enhanced_text, style)
         
-        print("✅ Image generation complete")
+        size = requested_image_size()
+        base64_image, mimetype = generate_base64_image(final_prompt, size)
         
-        return jsonify({
+        return image_response({
             "success": True,
+            "enhanced_prompt": enhanced_text,
             "image": base64_image,
-            "prompt_used": final_prompt
-        }), 200
+            "mimetype": mimetype,
+            "prompt_used": final_prompt,
+            "width": size,
+            "height": size
+        })
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -330,6 +638,14 @@ def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
 
 
+@app.errorhandler(429)
+def rate_limited(error):
+    return jsonify({
+        "success": False,
+        "error": "Rate limit reached. Please wait a moment before trying again."
+    }), 429
+
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
@@ -347,17 +663,21 @@ if __name__ == '__main__':
     print(f"🎨 Image Generation: Pollinations.AI (Free, No API Key Needed)")
     print(f"📁 Working Directory: {os.getcwd()}")
     print(f"🌐 Server: http://127.0.0.1:5000")
-    print(f"⏱️  Rate Limit: {MAX_REQUESTS_PER_MINUTE} requests per minute")
+    print(f"⏱️  Rate Limit: {RATE_LIMIT} per client")
     print("\n🔌 API Endpoints:")
     print("   - GET  /               (Frontend)")
     print("   - GET  /api/health")
     print("   - POST /api/enhance-prompt (Gemini)")
     print("   - POST /api/generate-image (Pollinations.AI)")
+    print("   - POST /api/generate-image/hires (1024x1024)")
+    print("   - POST /api/generate-image/raw (image bytes)")
+    print("   - POST /api/enhance-and-generate (Gemini + Pollinations.AI)")
     print("\n💡 Features:")
     print("   ✅ Prompt enhancement uses your Gemini API key")
     print("   ✅ Image generation is 100% FREE (Pollinations.AI)")
     print("   ✅ No additional API keys needed for images")
-    print("   ✅ Images take 5-15 seconds to generate")
+    print("   ✅ Images take 5-15 seconds to generate (512x512 previews are faster)")
     print("="*60 + "\n")
     
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    # Development server only; use wsgi.py with gunicorn in production
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='127.0.0.1', port=5000)
\ No newline at end of file
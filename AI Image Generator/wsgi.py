@@ -0,0 +1,6 @@
+"""WSGI entrypoint for production servers.
+
+Run with:
+    gunicorn -w 4 -k gthread --threads 16 --timeout 120 -b 0.0.0.0:5000 wsgi:app
+"""
+from app import app
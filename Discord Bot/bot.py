@@ -2,21 +2,35 @@ import ssl
 import certifi
 import discord
 import aiohttp
-import json
-import requests
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_meme():
-   response = requests.get('https://meme-api.com/gimme')
-   json_data = json.loads(response.text)
+# Reuse the last meme for a few seconds so bursts of 'meme' share one fetch
+MEME_CACHE_SECONDS = 5
+_meme_cache = {"ts": float('-inf'), "url": None}
+_meme_lock = asyncio.Lock()
+
+async def get_meme(session):
+   async with _meme_lock:
+      now = time.monotonic()
+      if now - _meme_cache["ts"] < MEME_CACHE_SECONDS:
+         return _meme_cache["url"]
+      async with session.get('https://meme-api.com/gimme', timeout=aiohttp.ClientTimeout(total=30)) as response:
+         json_data = await response.json()
+      _meme_cache.update(ts=now, url=json_data['url'])
    return json_data['url']
    
 ssl_context = ssl.create_default_context(cafile=certifi.where())
 
 class MyClient(discord.Client):
+  def __init__(self, session, **kwargs):
+    super().__init__(**kwargs)
+    self.session = session
+
   async def on_ready(self):
     print('Logged on as {0}!'.format(self.user))
 
@@ -25,16 +39,16 @@ class MyClient(discord.Client):
       return
 
     if message.content.startswith('meme'):
-      await message.channel.send(get_meme())
+      url = await get_meme(self.session)
+      await message.channel.send(url)
 
 intents = discord.Intents.default()
 intents.message_content = True
 
 async def main():
     async with aiohttp.ClientSession() as session:
-        client = MyClient(intents=intents)
+        client = MyClient(session, intents=intents)
         token = os.getenv('DISCORD_TOKEN')
         await client.start(token, reconnect=True)
 
-import asyncio
 asyncio.run(main())
@@ -1,85 +1,128 @@
 import cv2 
 import numpy as np 
 import face_recognition
+import dlib
 import os
+import json
+from pathlib import Path
 from datetime import datetime
 
 path = 'ImageAttendance'
-images = []
-classNames = []
-mylist = os.listdir(path)
+encPath = Path('encodings.npy')
+namesPath = Path('names.json')
+mylist = sorted(os.listdir(path))
 print(mylist)
-for cls in mylist:
-    curImg = cv2.imread(f'{path}/{cls}')
-    images.append(curImg)
-    classNames.append(os.path.splitext(cls)[0])
+classNames = [os.path.splitext(cls)[0] for cls in mylist]
 
 print(classNames)
 
+# The CNN detector is only practical when dlib was built with CUDA
+# (python setup.py install --yes DLIB_USE_CUDA); fall back to HOG on CPU
+FACE_MODEL = 'cnn' if dlib.DLIB_USE_CUDA else 'hog'
+print(f'Face detector: {FACE_MODEL}')
+
 def findEncodings(images):
     encodelist = [] 
     for img in images:
         img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        encode = face_recognition.face_encodings(img)[0]
+        encode = face_recognition.face_encodings(img, face_recognition.face_locations(img, model=FACE_MODEL))[0]
         encodelist.append(encode)
 
     return encodelist
 
-def markAttendence(name):
-    with open('Attendence.csv', 'r+') as f:
-        mydatalist = f.readlines()
-        namelist=[]
-        print(mydatalist)
-        for line in mydatalist:
-            entry = line.split(',')
-            namelist.append(entry[0])
-        if name not in namelist:
-            now = datetime.now()
-            dtString = now.strftime('%h:%M:%S')
-            f.writelines(f'n{name}, {dtString}')
-
-
+# Names already in the attendance file, loaded once; new entries are appended
+with open('Attendence.csv', 'r') as f:
+    markedNames = {line.split(',', 1)[0].strip() for line in f}
+attendanceFile = open('Attendence.csv', 'a', buffering=1)
 
-
-
-encodelistKnown = findEncodings(images)
-print('Encoding Complete')
+def markAttendence(name):
+    if name in markedNames:
+        return
+    markedNames.add(name)
+    now = datetime.now()
+    dtString = now.strftime('%H:%M:%S')
+    attendanceFile.write(f'\n{name}, {dtString}')
+
+
+
+
+def encodingsAreFresh():
+    # Cached encodings are valid if newer than every image and the folder itself,
+    # and were computed for the same names with the same face detector
+    if not (encPath.exists() and namesPath.exists()):
+        return False
+    newest = max([Path(path).stat().st_mtime] + [p.stat().st_mtime for p in Path(path).iterdir()])
+    cached = json.loads(namesPath.read_text())
+    if not isinstance(cached, dict):
+        return False
+    return (encPath.stat().st_mtime >= newest
+            and cached.get('names') == classNames
+            and cached.get('model') == FACE_MODEL)
+
+
+if encodingsAreFresh():
+    print('Loaded Cached Encodings')
+else:
+    images = [cv2.imread(f'{path}/{cls}') for cls in mylist]
+    np.save(encPath, np.stack(findEncodings(images)))
+    del images
+    namesPath.write_text(json.dumps({'names': classNames, 'model': FACE_MODEL}))
+    print('Encoding Complete')
+
+# Float encodings stay memory-mapped; only the best candidate's row is read per face
+knownMatrix = np.load(encPath, mmap_mode='r')
+MATCH_THRESHOLD = 0.6  # Same tolerance face_recognition.compare_faces uses
+
+# int8 copy of the known encodings for the nearest-face search. One scale for
+# all dimensions keeps squared distances proportional, so argmin is preserved
+quantScale = np.abs(knownMatrix).max() / 127
+quantKnown = np.round(knownMatrix / quantScale).astype(np.int8)
+PROCESS_EVERY = 3  # Run face detection on every Nth frame
+USE_OPENCL = cv2.ocl.haveOpenCL()  # Offload resize + colour conversion via cv2.UMat
+cv2.ocl.setUseOpenCL(USE_OPENCL)
 
 cap = cv2.VideoCapture(0)
+frameIdx = 0
+lastMatches = []
 
 while True:
     success, img = cap.read()
-    imgS = cv2.resize(img,(0,0), None,0.25,0.25)
-    imgS = cv2.cvtColor(imgS, cv2.COLOR_BGR2RGB)
-
-
-    facesCurFrame = face_recognition.face_locations(imgS)
-    encodeCurFrame = face_recognition.face_encodings(imgS, facesCurFrame)
-
-    for encodeFace,faceloc in zip(encodeCurFrame,facesCurFrame):
-        matches = face_recognition.compare_faces(encodelistKnown,encodeFace)
-        faceDis = face_recognition.face_distance(encodelistKnown,encodeFace)
-        #print(faceDis)
-        matchIndex = np.argmin(faceDis)
-
-        if matches[matchIndex]:
-            name = classNames[matchIndex].upper()
-            #print(name)
-            y1,x2,y2,x1 = faceloc
-            y1,x2,y2,x1 = y1*4,x2*4,y2*4,x1*4
-            cv2.rectangle(img,(x1,y1),(x2,y2),(0,255,0),2)
-            cv2.rectangle(img,(x1,y2-35),(x2,y2),(0,255,0),cv2.FILLED)
-            cv2.putText(img,name,(x1+6,y2-6),cv2.FONT_HERSHEY_COMPLEX,1,(255,255,255),2)
-            markAttendence(name)
-
-        
+    frameIdx += 1
+
+    if frameIdx % PROCESS_EVERY == 0:
+        if USE_OPENCL:
+            imgS = cv2.resize(cv2.UMat(img),(0,0), None,0.25,0.25)
+            imgS = cv2.cvtColor(imgS, cv2.COLOR_BGR2RGB).get()
+        else:
+            imgS = cv2.resize(img,(0,0), None,0.25,0.25)
+            imgS = cv2.cvtColor(imgS, cv2.COLOR_BGR2RGB)
+
+        facesCurFrame = face_recognition.face_locations(imgS, model=FACE_MODEL)
+        encodeCurFrame = face_recognition.face_encodings(imgS, facesCurFrame)
+
+        lastMatches = []
+        for encodeFace,faceloc in zip(encodeCurFrame,facesCurFrame):
+            quantFace = np.round(encodeFace / quantScale).clip(-127,127).astype(np.int8)
+            # int8 differences fit in int16; accumulate the 128 squares in int32
+            diff = np.subtract(quantKnown, quantFace, dtype=np.int16)
+            quantDis = np.einsum('ij,ij->i', diff, diff, dtype=np.int32)
+            #print(quantDis)
+            matchIndex = int(np.argmin(quantDis))
+
+            # Check the threshold on the float encoding of the best candidate only
+            if np.linalg.norm(knownMatrix[matchIndex] - encodeFace) < MATCH_THRESHOLD:
+                name = classNames[matchIndex].upper()
+                #print(name)
+                lastMatches.append((name, faceloc))
+                markAttendence(name)
+
+    # Redraw the latest matches on skipped frames so boxes don't flicker
+    for name, faceloc in lastMatches:
+        y1,x2,y2,x1 = faceloc
+        y1,x2,y2,x1 = y1*4,x2*4,y2*4,x1*4
+        cv2.rectangle(img,(x1,y1),(x2,y2),(0,255,0),2)
+        cv2.rectangle(img,(x1,y2-35),(x2,y2),(0,255,0),cv2.FILLED)
+        cv2.putText(img,name,(x1+6,y2-6),cv2.FONT_HERSHEY_COMPLEX,1,(255,255,255),2)
+
     cv2.imshow('Webcam', img)
     cv2.waitKey(1)
-    
-
-
-
-
-
-
-